@@ -6,47 +6,138 @@ shared between the desktop editor and this CLI. The key must be entered via the
 CodeSmith settings page in the editor.
 """
 import argparse
+import functools
+import hashlib
+import itertools
 import json
+import math
 import os
+import re
 import sys
-from typing import List, Optional
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from semantic_router import Route, SemanticRouter
 from semantic_router.llms import OpenAILLM
 from semantic_router.schema import Message
 
+try:  # Optional dependency for faster JSON handling
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except Exception:  # pragma: no cover - fall back to the standard library
+    orjson = None  # type: ignore
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    _loads = json.loads
+
+try:  # Optional dependency for streaming search results
+    import ijson
+except Exception:  # pragma: no cover - handled when ijson missing
+    ijson = None  # type: ignore
+
+try:  # Optional dependency for talking to YaCy over a UNIX socket
+    from requests_unixsocket.adapters import UnixAdapter
+except Exception:  # pragma: no cover - handled when package missing
+    UnixAdapter = None  # type: ignore
+
 try:  # Optional dependency for listing models
     from openai import OpenAI
 except Exception:  # pragma: no cover - handled when SDK missing
     OpenAI = None  # type: ignore
 
+try:  # HTTP/2 for SDK requests needs a recent SDK and the h2 package
+    import h2  # noqa: F401
+    from openai import DefaultHttpxClient
+except Exception:  # pragma: no cover - fall back to the SDK's HTTP/1.1 client
+    DefaultHttpxClient = None  # type: ignore
+
 
 AGENT_NAME = "CodeSmith"
 YACY_SEARCH_URL = os.environ.get("YACY_SEARCH_URL", "http://localhost:8090/yacysearch.json")
 
+MODEL_CACHE_TTL = 24 * 60 * 60
+SHORT_PROMPT_WORDS = 12
+# Roughly 100K tokens, leaving headroom in a 128K context window.
+MAX_CODEBASE_BYTES = 400_000
+MAX_CODEBASE_FILE_BYTES = 256 * 1024
+
+_WS_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"\w+")
+_WORD_BYTES_RE = re.compile(rb"\w+")
+_SYMBOL_RE = re.compile(
+    rb"^([ \t]*)(?:async[ \t]+)?(def|class)[ \t]+(\w+)", re.MULTILINE
+)
+_MODULE_RE = re.compile(rb"^File: .*?(\w+)\.\w+$", re.MULTILINE)
+_SNIPPET_MAX = 160
+_SNIPPET_TRUNCATE = _SNIPPET_MAX - 3
+
 SETTINGS_FILE = os.path.join(os.path.expanduser("~"), ".codesmith_settings.json")
+RESPONSE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "codesmith")
+RESPONSE_CACHE_TTL = 24 * 60 * 60
+
+
+def _make_session() -> requests.Session:
+    """Create a pooled HTTP session shared by all outgoing web requests."""
+    session = requests.Session()
+    retries = Retry(total=2, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if UnixAdapter is not None:
+        session.mount("http+unix://", UnixAdapter())
+    return session
+
+
+_SESSION = _make_session()
+
+
+def _read_bytes(path: str) -> bytes:
+    """Read a whole file with ``os.open``/``os.read``, skipping file objects."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.read(fd, os.fstat(fd).st_size)
+    finally:
+        os.close(fd)
+
+
+_settings_cache: Optional[dict] = None
+_settings_mtime: int = 0
 
 
 def load_settings() -> dict:
     """Load persisted settings for CodeSmith.
 
-    Returns an empty dictionary if the settings file does not exist or cannot
-    be read.
+    The parsed file is cached and only re-read when its modification time
+    changes. Returns an empty dictionary if the settings file does not exist
+    or cannot be read.
     """
+    global _settings_cache, _settings_mtime
     try:
-        with open(SETTINGS_FILE, "r", encoding="utf-8") as fh:
-            return json.load(fh)
+        mtime = os.stat(SETTINGS_FILE).st_mtime_ns
+        if _settings_cache is None or mtime != _settings_mtime:
+            _settings_cache = _loads(_read_bytes(SETTINGS_FILE))
+            _settings_mtime = mtime
+        return dict(_settings_cache)
     except Exception:
         return {}
 
 
 def save_settings(settings: dict) -> None:
     """Persist CodeSmith settings to disk."""
-    os.makedirs(os.path.dirname(SETTINGS_FILE), exist_ok=True)
-    with open(SETTINGS_FILE, "w", encoding="utf-8") as fh:
-        json.dump(settings, fh)
+    global _settings_cache
+    with open(SETTINGS_FILE, "wb") as fh:
+        fh.write(_dumps(settings))
+    _settings_cache = None
 
 
 def load_api_key() -> str:
@@ -64,28 +155,172 @@ def load_api_key() -> str:
     return api_key
 
 
-def _gather_codebase() -> str:
-    """Collect contents of repository files for question mode."""
-    parts: List[str] = []
-    for root, _, files in os.walk("."):
+_codebase_cache: Optional[Tuple[int, bytearray, List[Tuple[int, int]]]] = None
+_codebase_index: Optional[Tuple[bytearray, List[Counter]]] = None
+_codebase_symbols_cache: Optional[Tuple[bytearray, frozenset]] = None
+
+_CODEBASE_SUFFIXES = (".py",)
+_CODEBASE_SPECIALS = frozenset({"readme.md"})
+_CODEBASE_SKIP_DIRS = frozenset(
+    {".git", "__pycache__", "node_modules", ".venv", "venv", "build", "dist", ".mypy_cache"}
+)
+
+
+def _codebase_files() -> List[Tuple[str, int, int]]:
+    """Return ``(path, mtime_ns, size)`` for files included in question mode.
+
+    Files larger than ``MAX_CODEBASE_FILE_BYTES`` are skipped.
+    """
+    entries: List[Tuple[str, int, int]] = []
+    for root, dirs, files in os.walk("."):
+        dirs[:] = [d for d in dirs if d not in _CODEBASE_SKIP_DIRS]
+        prefix = root + os.sep
         for name in files:
-            if name.endswith(".py") or name.lower() == "readme.md":
-                path = os.path.join(root, name)
+            if name.endswith(_CODEBASE_SUFFIXES) or name.lower() in _CODEBASE_SPECIALS:
+                path = prefix + name
                 try:
-                    with open(path, "r", encoding="utf-8") as fh:
-                        parts.append(f"File: {path}\n{fh.read()}")
+                    st = os.stat(path)
                 except OSError:
                     continue
-    return "\n\n".join(parts)
+                if st.st_size > MAX_CODEBASE_FILE_BYTES:
+                    continue
+                entries.append((path, st.st_mtime_ns, st.st_size))
+    return entries
 
 
-def _create_search_query(prompt: str, model: str) -> str:
-    """Ask the selected model to craft a concise web search query."""
+def _read_codebase_file(path: str) -> Optional[bytes]:
+    """Read one repository file for question mode, or ``None`` on failure."""
     try:
-        api_key = load_api_key()
-        router = get_router(api_key)
-    except RuntimeError:
-        return prompt
+        return b"File: " + path.encode("utf-8") + b"\n" + _read_bytes(path)
+    except OSError:
+        return None
+
+
+def _load_codebase() -> Tuple[bytearray, List[Tuple[int, int]]]:
+    """Return the raw gathered codebase and the byte span of each file.
+
+    The result is cached and only rebuilt when a file is added, removed or
+    modified.
+    """
+    global _codebase_cache
+    entries = _codebase_files()
+    fingerprint = hash(tuple(entries))
+    if _codebase_cache is not None and _codebase_cache[0] == fingerprint:
+        return _codebase_cache[1], _codebase_cache[2]
+    paths = [path for path, _, _ in entries]
+    # Append each file into one buffer as it arrives instead of holding a
+    # list of parts plus their joined copy.
+    buf = bytearray()
+    spans: List[Tuple[int, int]] = []
+    with ThreadPoolExecutor(max_workers=min(16, len(paths) or 1)) as pool:
+        for part in pool.map(_read_codebase_file, paths):
+            if part is None:
+                continue
+            if buf:
+                buf += b"\n\n"
+            start = len(buf)
+            buf += part
+            spans.append((start, len(buf)))
+    _codebase_cache = (fingerprint, buf, spans)
+    return buf, spans
+
+
+def _codebase_term_counts(buf: bytearray, spans: List[Tuple[int, int]]) -> List[Counter]:
+    """Return per-file term frequencies, cached alongside the codebase buffer."""
+    global _codebase_index
+    if _codebase_index is None or _codebase_index[0] is not buf:
+        counts = [Counter(_WORD_BYTES_RE.findall(buf[start:end].lower())) for start, end in spans]
+        _codebase_index = (buf, counts)
+    return _codebase_index[1]
+
+
+def _codebase_symbols(buf: bytearray) -> frozenset:
+    """Return names of modules, functions and classes in the gathered codebase ``buf``."""
+    global _codebase_symbols_cache
+    if _codebase_symbols_cache is None or _codebase_symbols_cache[0] is not buf:
+        names = _MODULE_RE.findall(buf)
+        # Only module-level definitions and methods count; helpers nested in
+        # functions ("worker", "score") are ordinary words.
+        in_class = False
+        for indent, kind, name in _SYMBOL_RE.findall(buf):
+            if not indent:
+                in_class = kind == b"class"
+                names.append(name)
+            elif in_class and len(indent.expandtabs(4)) <= 4:
+                names.append(name)
+        # Very short names ("a", "io") collide with ordinary words.
+        symbols = frozenset(n.decode("utf-8", "replace") for n in names if len(n) > 2)
+        _codebase_symbols_cache = (buf, symbols)
+    return _codebase_symbols_cache[1]
+
+
+def _needs_web_search(prompt: str, mode: str, buf: Optional[bytearray] = None) -> bool:
+    """Return ``False`` for qa prompts that name a module or symbol in the repo.
+
+    Such questions are answered from the repository contents alone, so the
+    search-query rewrite and web search are skipped. ``buf`` is the gathered
+    codebase, loaded if not given.
+    """
+    if mode != "qa":
+        return True
+    symbols = _codebase_symbols(_load_codebase()[0] if buf is None else buf)
+    return not any(word in symbols for word in _WORD_RE.findall(prompt))
+
+
+def _rank_files(query: str, counts: List[Counter]) -> List[int]:
+    """Return file indices ordered by Okapi BM25 relevance to ``query``."""
+    terms = {word.encode("utf-8") for word in _WORD_RE.findall(query.lower())}
+    lengths = [sum(c.values()) for c in counts]
+    avg_len = (sum(lengths) / len(lengths)) if lengths else 0.0
+    k1, b = 1.5, 0.75
+    idf = {}
+    for term in terms:
+        df = sum(1 for c in counts if term in c)
+        idf[term] = math.log((len(counts) - df + 0.5) / (df + 0.5) + 1)
+
+    def score(i: int) -> float:
+        norm = k1 * (1 - b + b * lengths[i] / avg_len) if avg_len else k1
+        total = 0.0
+        for term in terms:
+            tf = counts[i].get(term, 0)
+            if tf:
+                total += idf[term] * tf * (k1 + 1) / (tf + norm)
+        return total
+
+    return sorted(range(len(counts)), key=score, reverse=True)
+
+
+def _gather_codebase(
+    query: str = "", codebase: Optional[Tuple[bytearray, List[Tuple[int, int]]]] = None
+) -> str:
+    """Collect contents of repository files for question mode.
+
+    If the repository exceeds ``MAX_CODEBASE_BYTES``, files are ranked by
+    BM25 relevance to ``query`` and the best matches are kept until the
+    budget is used up. ``codebase`` is a :func:`_load_codebase` result,
+    loaded if not given.
+    """
+    buf, spans = _load_codebase() if codebase is None else codebase
+    if len(buf) <= MAX_CODEBASE_BYTES:
+        return buf.decode("utf-8", "replace")
+    chosen: List[Tuple[int, int]] = []
+    used = 0
+    for i in _rank_files(query, _codebase_term_counts(buf, spans)):
+        size = spans[i][1] - spans[i][0] + 2
+        if used + size <= MAX_CODEBASE_BYTES:
+            chosen.append(spans[i])
+            used += size
+    chosen.sort()
+    return b"\n\n".join(buf[start:end] for start, end in chosen).decode("utf-8", "replace")
+
+
+@functools.lru_cache(maxsize=256)
+def _generate_search_query(prompt: str, model: str) -> str:
+    """Return the model-crafted search query for ``prompt``.
+
+    Failures raise instead of falling back so that they are not memoized.
+    """
+    router = get_router(load_api_key())
     messages = [
         Message(
             role="system",
@@ -93,16 +328,46 @@ def _create_search_query(prompt: str, model: str) -> str:
         ),
         Message(role="user", content=prompt),
     ]
+    route = router.check_for_matching_routes(model)
+    llm = route.llm if route and route.llm else router.llm
+    if llm is None:
+        raise RuntimeError("No LLM configured for Semantic Router.")
+    return llm(messages).strip()
+
+
+def _create_search_query(prompt: str, model: str) -> str:
+    """Ask the selected model to craft a concise web search query.
+
+    Prompts of at most ``SHORT_PROMPT_WORDS`` words are already concise
+    enough to search for and are returned unchanged.
+    """
+    if len(prompt.split()) <= SHORT_PROMPT_WORDS:
+        return prompt
     try:
-        route = router.check_for_matching_routes(model)
-        llm = route.llm if route and route.llm else router.llm
-        if llm is None:
-            return prompt
-        return llm(messages).strip()
+        return _generate_search_query(prompt, model)
     except Exception:
         return prompt
 
 
+@functools.lru_cache(maxsize=128)
+def _fetch_search_items(query: str, max_results: int) -> Tuple[dict, ...]:
+    """Fetch raw YaCy result items; errors propagate and are not cached."""
+    with _SESSION.get(
+        YACY_SEARCH_URL,
+        params={"query": query, "rows": max_results},
+        timeout=10,
+        stream=ijson is not None,
+    ) as resp:
+        resp.raise_for_status()
+        if ijson is not None:
+            # Only parse the items we use rather than the whole document.
+            resp.raw.decode_content = True
+            items = ijson.items(resp.raw, "channels.item.items.item")
+            return tuple(itertools.islice(items, max_results))
+        data = _loads(resp.content)
+    return tuple(data.get("channels", [{}])[0].get("items", [])[:max_results])
+
+
 def _web_search(query: str, max_results: int = 5) -> str:
     """Perform a YaCy web search and return result snippets.
 
@@ -113,19 +378,12 @@ def _web_search(query: str, max_results: int = 5) -> str:
     """
 
     try:
-        resp = requests.get(
-            YACY_SEARCH_URL,
-            params={"query": query, "rows": max_results},
-            timeout=10,
-        )
-        resp.raise_for_status()
-        data = resp.json()
+        items = _fetch_search_items(query, max_results)
     except Exception as exc:  # pragma: no cover - network errors
         return f"Web search failed: {exc}"
 
-    items = data.get("channels", [{}])[0].get("items", [])
     results: List[str] = []
-    for item in items[:max_results]:
+    for item in items:
         title = item.get("title", "No title").strip()
         link = item.get("link") or ""
         snippet = (
@@ -133,9 +391,9 @@ def _web_search(query: str, max_results: int = 5) -> str:
             or item.get("about")
             or ""
         ).strip()
-        snippet = " ".join(snippet.split())  # collapse whitespace
-        if len(snippet) > 160:
-            snippet = f"{snippet[:157]}..."
+        snippet = _WS_RE.sub(" ", snippet)  # collapse whitespace
+        if len(snippet) > _SNIPPET_MAX:
+            snippet = snippet[:_SNIPPET_TRUNCATE] + "..."
         results.append(f"{title} - {link}\n  {snippet}" if snippet else f"{title} - {link}")
 
     if not results:
@@ -147,24 +405,47 @@ _router: Optional[SemanticRouter] = None
 _model_cache: List[str] = []
 
 
+@functools.lru_cache(maxsize=4)
+def _openai_client(api_key: str) -> "OpenAI":
+    """Return a shared OpenAI SDK client for ``api_key``.
+
+    When HTTP/2 is available, concurrent requests (streamed answers,
+    autocomplete, edits) share a single multiplexed connection.
+    """
+    if DefaultHttpxClient is not None:
+        return OpenAI(api_key=api_key, http_client=DefaultHttpxClient(http2=True))
+    return OpenAI(api_key=api_key)
+
+
 def list_openai_models(api_key: str) -> List[str]:
     """Return available OpenAI model IDs.
 
+    Successful lookups are persisted in the settings file for
+    ``MODEL_CACHE_TTL`` seconds so that new processes skip the API call.
     Falls back to ``gpt-4o-mini`` if fetching fails or the SDK is absent.
     """
     global _model_cache
     if _model_cache:
         return _model_cache
+    settings = load_settings()
+    cached = settings.get("models_cache")
+    if cached and time.time() - settings.get("models_cache_ts", 0) < MODEL_CACHE_TTL:
+        _model_cache = list(cached)
+        return _model_cache
     if OpenAI is None:
         _model_cache = ["gpt-4o-mini"]
         return _model_cache
     try:
-        client = OpenAI(api_key=api_key)
-        resp = client.models.list()
+        resp = _openai_client(api_key).models.list()
         models = [m.id for m in resp.data if m.id.startswith("gpt")]
         _model_cache = models or ["gpt-4o-mini"]
     except Exception:  # pragma: no cover - network or auth issues
         _model_cache = ["gpt-4o-mini"]
+        return _model_cache
+    try:
+        save_settings({**settings, "models_cache": _model_cache, "models_cache_ts": time.time()})
+    except OSError:
+        pass
     return _model_cache
 
 
@@ -187,24 +468,51 @@ def get_router(api_key: str) -> SemanticRouter:
     return _router
 
 
-def _build_messages(prompt: str, mode: str, model: str) -> List[Message]:
-    """Create messages for the OpenAI model via Semantic Router."""
-    search_query = _create_search_query(prompt, model)
-    search_info = _web_search(search_query)
+def _build_messages(
+    prompt: str,
+    mode: str,
+    model: str,
+    codebase: Optional[Tuple[bytearray, List[Tuple[int, int]]]] = None,
+) -> List[Message]:
+    """Create messages for the OpenAI model via Semantic Router.
+
+    In question mode ``codebase`` is the :func:`_load_codebase` result the
+    caller already holds, so the repository is walked only once per request.
+    """
     if mode == "qa":
-        context = _gather_codebase()
+        if codebase is None:
+            codebase = _load_codebase()
+        question = f"Question: {prompt}"
+        if _needs_web_search(prompt, mode, codebase[0]):
+            # Selecting files does not depend on the search query, so
+            # overlap it with the query-rewrite round-trip.
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                context_future = pool.submit(_gather_codebase, prompt, codebase)
+                search_query = _create_search_query(prompt, model)
+                search_info = _web_search(search_query)
+                context = context_future.result()
+            question = (
+                f"Search query: {search_query}\n"
+                f"Web search results:\n{search_info}\n\n{question}"
+            )
+        else:
+            context = _gather_codebase(prompt, codebase)
         system_content = (
             f"You are {AGENT_NAME}, an AI assistant answering questions about the NovaAtom codebase."
         )
-        user_content = (
-            f"Repository contents:\n{context}\n\nSearch query: {search_query}\n"
-            f"Web search results:\n{search_info}\n\nQuestion: {prompt}"
-        )
-    else:
-        system_content = f"You are {AGENT_NAME}, an AI coding assistant."
-        user_content = (
-            f"Search query: {search_query}\nWeb search results:\n{search_info}\n\nPrompt: {prompt}"
-        )
+        # The repository goes in its own leading message so that the prompt
+        # prefix stays identical across questions and can be cached upstream.
+        return [
+            Message(role="system", content=system_content),
+            Message(role="user", content=f"Repository contents:\n{context}"),
+            Message(role="user", content=question),
+        ]
+    search_query = _create_search_query(prompt, model)
+    search_info = _web_search(search_query)
+    system_content = f"You are {AGENT_NAME}, an AI coding assistant."
+    user_content = (
+        f"Search query: {search_query}\nWeb search results:\n{search_info}\n\nPrompt: {prompt}"
+    )
     return [
         Message(role="system", content=system_content),
         Message(role="user", content=user_content),
@@ -230,6 +538,58 @@ def _build_edit_messages(file_content: str, instructions: str, model: str) -> Li
     ]
 
 
+_response_cache: Dict[str, str] = {}
+_RESPONSE_CACHE_SIZE = 256
+
+
+def _response_key(
+    prompt: str, mode: str, model: str, buf: Optional[bytearray] = None
+) -> str:
+    """Hash a request for the response cache.
+
+    In question mode the key also covers the gathered repository contents
+    ``buf`` (loaded if not given) so that answers are invalidated only when
+    the code actually changes.
+    """
+    digest = hashlib.sha256(f"{model}\0{mode}\0{prompt}".encode("utf-8"))
+    if mode == "qa":
+        digest.update(_load_codebase()[0] if buf is None else buf)
+    return digest.hexdigest()
+
+
+def _cached_response(key: str, allow_stale: bool = False) -> Optional[str]:
+    """Return a cached response, checking memory first and then disk.
+
+    Disk entries older than ``RESPONSE_CACHE_TTL`` are ignored unless
+    ``allow_stale`` is set.
+    """
+    if key in _response_cache:
+        return _response_cache[key]
+    path = os.path.join(RESPONSE_CACHE_DIR, f"{key}.json")
+    try:
+        if not allow_stale and time.time() - os.stat(path).st_mtime > RESPONSE_CACHE_TTL:
+            return None
+        return _loads(_read_bytes(path))["response"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _store_response(key: str, response: str) -> None:
+    """Remember a response in memory and atomically persist it to disk."""
+    if len(_response_cache) >= _RESPONSE_CACHE_SIZE:
+        _response_cache.pop(next(iter(_response_cache)))
+    _response_cache[key] = response
+    path = os.path.join(RESPONSE_CACHE_DIR, f"{key}.json")
+    try:
+        os.makedirs(RESPONSE_CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(_dumps({"response": response}))
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
 def query_ai(prompt: str, mode: str, model: Optional[str] = None) -> str:
     """Send a prompt to the AI model and return the response text.
 
@@ -237,16 +597,114 @@ def query_ai(prompt: str, mode: str, model: Optional[str] = None) -> str:
         prompt: User prompt.
         mode: Either ``"coding"`` or ``"qa"``.
         model: Optional OpenAI model name; defaults to the first available model.
+
+    Responses are cached in memory and under ``RESPONSE_CACHE_DIR``; a stale
+    cached answer is returned if the request fails.
     """
     api_key = load_api_key()
     router = get_router(api_key)
     model_name = model or list_openai_models(api_key)[0]
-    messages = _build_messages(prompt, mode, model_name)
+    # Walk the repository once and share it between the key and the prompt.
+    codebase = _load_codebase() if mode == "qa" else None
+    key = _response_key(prompt, mode, model_name, None if codebase is None else codebase[0])
+    cached = _cached_response(key)
+    if cached is not None:
+        return cached
+    messages = _build_messages(prompt, mode, model_name, codebase)
     route = router.check_for_matching_routes(model_name)
     llm = route.llm if route and route.llm else router.llm
     if llm is None:
         raise RuntimeError("No LLM configured for Semantic Router.")
-    return llm(messages).strip()
+    try:
+        answer = llm(messages).strip()
+    except Exception:
+        stale = _cached_response(key, allow_stale=True)
+        if stale is None:
+            raise
+        return stale
+    _store_response(key, answer)
+    return answer
+
+
+def stream_ai(prompt: str, mode: str, model: Optional[str] = None) -> Iterator[str]:
+    """Like :func:`query_ai` but yield the response text as it is generated.
+
+    The final completion is requested directly from the OpenAI SDK with the
+    routed model's settings, since Semantic Router does not stream. Without
+    the SDK the full response is yielded as a single chunk. Responses share
+    the :func:`query_ai` cache.
+    """
+    api_key = load_api_key()
+    router = get_router(api_key)
+    model_name = model or list_openai_models(api_key)[0]
+    # Walk the repository once and share it between the key and the prompt.
+    codebase = _load_codebase() if mode == "qa" else None
+    key = _response_key(prompt, mode, model_name, None if codebase is None else codebase[0])
+    cached = _cached_response(key)
+    if cached is not None:
+        yield cached
+        return
+    if OpenAI is None:
+        yield query_ai(prompt, mode, model_name)
+        return
+    messages = _build_messages(prompt, mode, model_name, codebase)
+    route = router.check_for_matching_routes(model_name)
+    llm = route.llm if route and route.llm else router.llm
+    if llm is None:
+        raise RuntimeError("No LLM configured for Semantic Router.")
+    parts: List[str] = []
+    try:
+        stream = _openai_client(api_key).chat.completions.create(
+            model=llm.name,
+            messages=[{"role": m.role, "content": m.content} for m in messages],
+            temperature=getattr(llm, "temperature", None),
+            max_tokens=getattr(llm, "max_tokens", None),
+            stream=True,
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+                yield parts[-1]
+    except Exception as exc:
+        stale = None if parts else _cached_response(key, allow_stale=True)
+        if stale is None:
+            raise RuntimeError(f"{AGENT_NAME} request failed: {exc}") from exc
+        yield stale
+        return
+    _store_response(key, "".join(parts).strip())
+
+
+def suggest_command(task: str, model: Optional[str] = None) -> str:
+    """Ask the model for a single shell command that accomplishes ``task``.
+
+    JSON mode is used so the command can be read from a structured response
+    instead of being stripped out of Markdown.
+    """
+    if OpenAI is None:
+        raise RuntimeError("The OpenAI SDK is required to suggest commands.")
+    api_key = load_api_key()
+    model_name = model or list_openai_models(api_key)[0]
+    try:
+        resp = _openai_client(api_key).chat.completions.create(
+            model=model_name,
+            messages=[
+                {
+                    "role": "system",
+                    "content": (
+                        f"You are {AGENT_NAME}, an AI assistant that writes shell commands. "
+                        'Respond with a JSON object of the form {"command": "<shell command>"}.'
+                    ),
+                },
+                {"role": "user", "content": task},
+            ],
+            response_format={"type": "json_object"},
+        )
+        command = _loads(resp.choices[0].message.content)["command"]
+    except Exception as exc:
+        raise RuntimeError(f"{AGENT_NAME} request failed: {exc}") from exc
+    if not isinstance(command, str) or not command.strip():
+        raise RuntimeError(f"{AGENT_NAME} did not return a command.")
+    return command.strip()
 
 
 def edit_file(path: str, instructions: str, model: Optional[str] = None) -> None:
@@ -308,8 +766,11 @@ def main(argv: List[str]) -> int:
             edit_file(ns.edit, prompt, ns.model)
             print(f"{AGENT_NAME}: Updated {ns.edit}")
         else:
-            answer = query_ai(prompt, ns.mode, ns.model)
-            print(f"{AGENT_NAME}: {answer}")
+            print(f"{AGENT_NAME}: ", end="", flush=True)
+            for chunk in stream_ai(prompt, ns.mode, ns.model):
+                sys.stdout.write(chunk)
+                sys.stdout.flush()
+            print()
     except RuntimeError as exc:
         print(exc)
         return 1
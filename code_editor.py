@@ -1,13 +1,19 @@
+import bisect
+import contextlib
+import difflib
+import heapq
 import os
 import sys
 import re
+import tempfile
 import keyword
-import importlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 import tkinter as tk
-from tkinter import filedialog, messagebox, simpledialog
+from tkinter import messagebox, simpledialog, ttk
 from tkinter.scrolledtext import ScrolledText
-import subprocess
 import threading
+import time
 
 from ai_cli import (
     AGENT_NAME,
@@ -16,11 +22,95 @@ from ai_cli import (
     list_openai_models,
     load_api_key,
     load_settings,
-    query_ai,
     save_settings,
+    stream_ai,
+    suggest_command,
 )
 from semantic_router.schema import Message
 
+AUTOCOMPLETE_DEBOUNCE_MS = 150
+AUTOCOMPLETE_PAGE_SIZE = 50
+AUTOCOMPLETE_MAX_SUGGESTIONS = 4 * AUTOCOMPLETE_PAGE_SIZE
+SUGGESTION_CACHE_TTL = 60
+SUGGESTION_CACHE_SIZE = 128
+WORD_INDEX_DEBOUNCE_MS = 50
+FILE_CHUNK_SIZE = 1 << 20
+
+_KEYWORDS = frozenset(keyword.kwlist)
+_WORD_RE = re.compile(r"\w+")
+# Lines with their endings, split on "\n" only as Tk does (str.splitlines
+# also breaks on form feeds, "\r", "\u2028" and others).
+_LINE_RE = re.compile(r"[^\n]*\n|[^\n]+")
+
+
+def _tcl_escape(text):
+    """Escape ``text`` so a Tcl regular expression matches it literally."""
+    return "".join(ch if ch.isalnum() else "\\" + ch for ch in text)
+
+
+class PrefixTrie:
+    """A set of words that can enumerate its members by prefix."""
+
+    _END = ""  # never a single character, so it cannot clash with a child key
+
+    def __init__(self, words=()):
+        self._root = {}
+        for word in words:
+            self.insert(word)
+
+    def insert(self, word):
+        node = self._root
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[self._END] = True
+
+    def remove(self, word):
+        path = []
+        node = self._root
+        for ch in word:
+            if ch not in node:
+                return
+            path.append((node, ch))
+            node = node[ch]
+        node.pop(self._END, None)
+        # Prune branches that no longer lead to any word.
+        for parent, ch in reversed(path):
+            if parent[ch]:
+                break
+            del parent[ch]
+
+    def iter_prefix(self, prefix):
+        node = self._root
+        for ch in prefix:
+            node = node.get(ch)
+            if node is None:
+                return
+        stack = [(prefix, node)]
+        while stack:
+            word, node = stack.pop()
+            for ch, child in node.items():
+                if ch == self._END:
+                    yield word
+                else:
+                    stack.append((word + ch, child))
+
+
+def _import_extension(path: str):
+    """Import the extension module at ``path`` and register it in ``sys.modules``."""
+    import importlib.util
+
+    mod_name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(mod_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[mod_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        sys.modules.pop(mod_name, None)
+        raise
+    return module
+
+
 class CodeEditor:
     def __init__(self, root: tk.Tk):
         self.root = root
@@ -30,6 +120,21 @@ class CodeEditor:
             value=self.settings.get("allow_terminal", False)
         )
         self.api_key = self.settings.get("api_key")
+        self._doc_cache = None
+        self._word_counts = Counter()
+        self._word_trie = PrefixTrie(_KEYWORDS)
+        self._word_index_stale = False
+        self._word_pending = None
+        self._word_index_after_id = None
+        self._find_query = None
+        self._find_cache = []
+        self._find_stale = True
+        self._autocomplete_after_id = None
+        self._suggestion_cache = {}
+        self._terminal_processes = set()
+        self._loading = None
+        # One worker keeps reads and writes in the order they were requested.
+        self._file_io = ThreadPoolExecutor(max_workers=1)
         self._setup_widgets()
         self.file_path = None
         self.extensions = []
@@ -40,6 +145,10 @@ class CodeEditor:
     def _setup_widgets(self):
         self.text = tk.Text(self.root, wrap="none", undo=True)
         self.text.pack(fill="both", expand=True)
+        self.text.tag_configure("find", background="yellow")
+        self.text.tag_configure("definition", background="lightblue")
+        self.text.bind("<<Modified>>", self._on_text_modified)
+        self._install_text_proxy()
 
         menubar = tk.Menu(self.root)
         file_menu = tk.Menu(menubar, tearoff=0)
@@ -53,7 +162,9 @@ class CodeEditor:
 
         edit_menu = tk.Menu(menubar, tearoff=0)
         edit_menu.add_command(label="Find", command=self.find_text, accelerator="Ctrl+F")
+        edit_menu.add_command(label="Find All...", command=self.find_all)
         edit_menu.add_command(label="Replace", command=self.replace_text, accelerator="Ctrl+H")
+        edit_menu.add_command(label="Replace Many...", command=self.replace_many)
         edit_menu.add_command(label="Go to Definition", command=self.goto_definition, accelerator="F12")
         menubar.add_cascade(label="Edit", menu=edit_menu)
 
@@ -150,13 +261,27 @@ class CodeEditor:
         ext_dir = os.path.join(os.path.dirname(__file__), "extensions")
         if not os.path.isdir(ext_dir):
             return
+        with os.scandir(ext_dir) as entries:
+            paths = [
+                entry.path
+                for entry in entries
+                if entry.name.endswith(".py") and not entry.name.startswith("_")
+            ]
+        # Import concurrently, but register on the Tk thread in a stable order.
+        # The directory is on sys.path meanwhile so extensions can import
+        # sibling helper modules (those whose names start with "_").
         sys.path.insert(0, ext_dir)
-        for fname in os.listdir(ext_dir):
-            if not fname.endswith(".py") or fname.startswith("_"):
-                continue
-            mod_name = os.path.splitext(fname)[0]
+        try:
+            with ThreadPoolExecutor(max_workers=min(4, len(paths) or 1)) as pool:
+                futures = [
+                    (path, pool.submit(_import_extension, path)) for path in sorted(paths)
+                ]
+        finally:
+            sys.path.remove(ext_dir)
+        for path, future in futures:
+            mod_name = os.path.splitext(os.path.basename(path))[0]
             try:
-                module = importlib.import_module(mod_name)
+                module = future.result()
             except Exception as exc:
                 print(f"Failed to load extension {mod_name}: {exc}", file=sys.stderr)
                 continue
@@ -169,10 +294,10 @@ class CodeEditor:
                         f"Error initializing extension {mod_name}: {exc}",
                         file=sys.stderr,
                     )
-        sys.path.pop(0)
 
     def new_file(self):
         if self._confirm_discard_changes():
+            self._loading = None
             self.text.delete(1.0, tk.END)
             self.file_path = None
             self.root.title("Basic Code Editor")
@@ -180,56 +305,234 @@ class CodeEditor:
     def open_file(self):
         if not self._confirm_discard_changes():
             return
+        from tkinter import filedialog
+
         file_path = filedialog.askopenfilename()
         if file_path:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    content = file.read()
+            def start():
+                file = open(file_path, 'r', encoding='utf-8')
+                try:
+                    return file, file.read(FILE_CHUNK_SIZE)
+                except Exception:
+                    file.close()
+                    raise
+
+            self._loading = None
+            self._run_async(
+                start,
+                lambda result: self._start_load(file_path, *result),
+                lambda e: messagebox.showerror("Error", f"Could not open file: {e}"),
+                executor=self._file_io,
+            )
+
+    def _start_load(self, file_path, file, chunk):
+        self.text.delete(1.0, tk.END)
+        self.file_path = file_path
+        self.root.title(f"Basic Code Editor - {file_path} (loading...)")
+        self._loading = file
+        self._load_chunk(file, chunk)
+
+    def _load_chunk(self, file, chunk):
+        """Append a chunk read on the I/O thread and request the next one.
+
+        Large files therefore load without freezing the editor.  Opening
+        another file or starting a new one abandons the load.
+        """
+        if file is not self._loading:
+            file.close()
+            return
+        self.text.insert(tk.END, chunk)
+        if len(chunk) < FILE_CHUNK_SIZE:
+            self._finish_load(file)
+            return
+
+        def failed(e):
+            # Never leave a partial buffer bound to the path: the next save
+            # would truncate the file on disk.
+            file.close()
+            if file is self._loading:
+                self._loading = None
                 self.text.delete(1.0, tk.END)
-                self.text.insert(tk.END, content)
-                self.file_path = file_path
-                self.root.title(f"Basic Code Editor - {file_path}")
-            except Exception as e:
-                messagebox.showerror("Error", f"Could not open file: {e}")
+                self.file_path = None
+                self.root.title("Basic Code Editor")
+            messagebox.showerror("Error", f"Could not open file: {e}")
+
+        self._run_async(
+            lambda: file.read(FILE_CHUNK_SIZE),
+            lambda next_chunk: self._load_chunk(file, next_chunk),
+            failed,
+            executor=self._file_io,
+        )
+
+    def _finish_load(self, file):
+        file.close()
+        if file is self._loading:
+            self._loading = None
+            self.root.title(f"Basic Code Editor - {self.file_path}")
 
     def save_file(self):
         if self.file_path:
-            try:
-                content = self.text.get(1.0, tk.END)
-                with open(self.file_path, 'w', encoding='utf-8') as file:
-                    file.write(content)
-            except Exception as e:
-                messagebox.showerror("Error", f"Could not save file: {e}")
+            self._write_file(self.file_path)
         else:
             self.save_file_as()
 
     def save_file_as(self):
+        from tkinter import filedialog
+
         file_path = filedialog.asksaveasfilename()
         if file_path:
+            self._write_file(file_path)
+
+    def _write_file(self, file_path):
+        """Atomically write the buffer to ``file_path`` on the I/O thread.
+
+        The new contents go to a temporary file beside the real target
+        (symlinks are followed) that then replaces it.  New files, files in
+        a directory we cannot write to, and files with other hard links are
+        written in place instead so the links and ownership survive.
+        """
+        if self._loading is not None:
+            messagebox.showerror("Error", "Wait for the file to finish loading.")
+            return
+        content = self._doc()
+
+        def dump(file):
+            # Slices keep the encoded copy to one chunk instead of the whole
+            # document.
+            for start in range(0, len(content), FILE_CHUNK_SIZE):
+                file.write(content[start:start + FILE_CHUNK_SIZE])
+
+        def write():
+            target = os.path.realpath(file_path)
             try:
-                content = self.text.get(1.0, tk.END)
-                with open(file_path, 'w', encoding='utf-8') as file:
-                    file.write(content)
-                self.file_path = file_path
-                self.root.title(f"Basic Code Editor - {file_path}")
-            except Exception as e:
-                messagebox.showerror("Error", f"Could not save file: {e}")
+                st = os.stat(target)
+            except FileNotFoundError:
+                st = None
+            directory = os.path.dirname(target)
+            if st is None or st.st_nlink > 1 or not os.access(directory, os.W_OK):
+                with open(target, 'w', encoding='utf-8') as file:
+                    dump(file)
+                return
+            # mkstemp creates the file exclusively with mode 0600; the real
+            # mode and owner are applied before any content is written.
+            fd, tmp = tempfile.mkstemp(
+                dir=directory, prefix=f".{os.path.basename(target)}.", suffix=".tmp"
+            )
+            try:
+                with open(fd, 'w', encoding='utf-8') as file:
+                    try:
+                        os.fchmod(file.fileno(), st.st_mode & 0o7777)
+                    except AttributeError:  # no fchmod on Windows
+                        os.chmod(tmp, st.st_mode & 0o7777)
+                    with contextlib.suppress(AttributeError, OSError):
+                        os.fchown(file.fileno(), st.st_uid, st.st_gid)
+                    dump(file)
+                os.replace(tmp, target)
+            except BaseException:
+                with contextlib.suppress(OSError):
+                    os.remove(tmp)
+                raise
+
+        def done(_):
+            self.file_path = file_path
+            self.root.title(f"Basic Code Editor - {file_path}")
+
+        self._run_async(
+            write,
+            done,
+            lambda e: messagebox.showerror("Error", f"Could not save file: {e}"),
+            executor=self._file_io,
+        )
 
     def _confirm_discard_changes(self) -> bool:
         return messagebox.askyesno("Confirm", "Discard current changes?")
 
     def find_text(self):
-        query = simpledialog.askstring("Find", "Enter text to find:")
+        """Highlight the next occurrence of a query after the cursor.
+
+        Match positions are cached per query until the buffer changes, so
+        repeating a find jumps to the next match without rescanning.
+        """
+        query = simpledialog.askstring(
+            "Find", "Enter text to find:", initialvalue=self._find_query or ""
+        )
         if query:
-            start_pos = self.text.search(query, "1.0", stopindex=tk.END)
+            repeat = query == self._find_query and bool(self.text.tag_ranges("find"))
+            positions = self._find_positions(query)
             self.text.tag_remove("find", "1.0", tk.END)
-            if start_pos:
-                end_pos = f"{start_pos}+{len(query)}c"
-                self.text.tag_add("find", start_pos, end_pos)
-                self.text.tag_config("find", background="yellow")
-                self.text.see(start_pos)
-            else:
+            if not positions:
                 messagebox.showinfo("Find", "Text not found")
+                return
+            cursor = tuple(map(int, self.text.index(tk.INSERT).split(".")))
+            i = bisect.bisect_left(positions, cursor)
+            if repeat and i < len(positions) and positions[i][:2] == cursor:
+                i += 1  # already on this match, move to the next one
+            line, col, length = positions[i % len(positions)]
+            start_pos = f"{line}.{col}"
+            end_pos = f"{start_pos}+{length}c"
+            self.text.tag_add("find", start_pos, end_pos)
+            self.text.mark_set(tk.INSERT, start_pos)
+            self.text.see(start_pos)
+
+    def find_all(self):
+        """Highlight every occurrence of a query and report how many there are.
+
+        Uses the same cached positions as :meth:`find_text` and tags all
+        matches in a single Tk call.
+        """
+        query = simpledialog.askstring(
+            "Find All", "Enter text to find:", initialvalue=self._find_query or ""
+        )
+        if query:
+            positions = self._find_positions(query)
+            self.text.tag_remove("find", "1.0", tk.END)
+            if not positions:
+                messagebox.showinfo("Find All", "Text not found")
+                return
+            ranges = []
+            for line, col, length in positions:
+                start_pos = f"{line}.{col}"
+                ranges += (start_pos, f"{start_pos}+{length}c")
+            self.text.tag_add("find", *ranges)
+            self.text.see(ranges[0])
+            messagebox.showinfo("Find All", f"{len(positions)} matches")
+
+    def _find_positions(self, query):
+        """Return sorted ``(line, column, length)`` matches of ``query`` in the buffer."""
+        self._check_modified()
+        if query == self._find_query and not self._find_stale:
+            return self._find_cache
+        positions = self._search_all(query)
+        self._find_query = query
+        self._find_cache = positions
+        self._find_stale = False
+        return positions
+
+    def _search_all(self, pattern, regexp=False):
+        """Return ``(line, column, length)`` for every match of ``pattern``.
+
+        The search runs inside Tk (``search -all``), so columns and lengths
+        are in Tk's own units.  Python string offsets differ from them on
+        lines holding characters outside the BMP.
+        """
+        count = tk.Variable(self.root)
+        options = ["-regexp"] if regexp else []
+        indices = self.text.tk.splitlist(
+            self.text.tk.call(
+                self.text._w, "search", "-all", "-count", str(count), *options,
+                "--", pattern, "1.0", tk.END,
+            )
+        )
+        if not indices:
+            return []
+        lengths = self.text.tk.globalgetvar(str(count))
+        if not isinstance(lengths, tuple):
+            lengths = self.text.tk.splitlist(str(lengths))
+        matches = []
+        for index, length in zip(indices, lengths):
+            line, col = str(index).split(".")
+            matches.append((int(line), int(col), int(length)))
+        return matches
 
     def replace_text(self):
         query = simpledialog.askstring("Replace", "Enter text to find:")
@@ -238,13 +541,86 @@ class CodeEditor:
         replacement = simpledialog.askstring("Replace", "Enter replacement text:")
         if replacement is None:
             return
-        content = self.text.get("1.0", tk.END)
-        new_content = content.replace(query, replacement)
-        if content == new_content:
+        if not query:
+            return
+        count = tk.IntVar()
+        replaced = 0
+        index = "1.0"
+        with self._undo_block():
+            while True:
+                index = self.text.search(query, index, stopindex=tk.END, count=count)
+                if not index:
+                    break
+                # Continue after the inserted text via a right-gravity mark;
+                # Python's len() undercounts non-BMP characters in Tk units.
+                self.text.mark_set("replace_end", f"{index}+{count.get()}c")
+                self.text.mark_gravity("replace_end", tk.RIGHT)
+                self.text.replace(index, "replace_end", replacement)
+                index = self.text.index("replace_end")
+                replaced += 1
+            self.text.mark_unset("replace_end")
+        if not replaced:
+            messagebox.showinfo("Replace", "Text not found")
+
+    def replace_many(self):
+        """Apply several find/replace pairs in a single pass over the buffer."""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Replace Many")
+        tk.Label(dialog, text="One pair per line:  find => replacement").pack(
+            anchor="w", padx=5, pady=5
+        )
+        pairs_text = ScrolledText(dialog, width=60, height=10)
+        pairs_text.pack(fill="both", expand=True, padx=5)
+
+        def apply():
+            pairs = {}
+            for line in pairs_text.get("1.0", "end-1c").splitlines():
+                find, sep, replacement = line.partition(" => ")
+                if sep and find:
+                    pairs[find] = replacement
+            dialog.destroy()
+            if pairs:
+                self._replace_pairs(pairs)
+
+        tk.Button(dialog, text="Replace All", command=apply).pack(pady=5)
+        pairs_text.focus_set()
+
+    def _replace_pairs(self, pairs):
+        # One alternation, longest alternatives first, so overlapping
+        # patterns resolve to the longest match like a multi-pattern automaton.
+        # The search runs in Tk so positions are in Tk's index units.
+        pattern = "|".join(_tcl_escape(find) for find in sorted(pairs, key=len, reverse=True))
+        matches = self._search_all(pattern, regexp=True)
+        if not matches:
             messagebox.showinfo("Replace", "Text not found")
             return
-        self.text.delete("1.0", tk.END)
-        self.text.insert("1.0", new_content)
+        with self._undo_block():
+            for line, col, length in reversed(matches):
+                start = f"{line}.{col}"
+                end = f"{start}+{length}c"
+                self.text.replace(start, end, pairs[self.text.get(start, end)])
+
+    @contextlib.contextmanager
+    def _undo_block(self):
+        """Group all edits made inside the block into a single undo step."""
+        self.text.edit_separator()
+        self.text.config(autoseparators=False)
+        try:
+            yield
+        finally:
+            self.text.config(autoseparators=True)
+            self.text.edit_separator()
+
+    def _apply_content(self, new_content: str):
+        """Replace the buffer with ``new_content``, rewriting only changed lines."""
+        old_lines = _LINE_RE.findall(self._doc())
+        new_lines = _LINE_RE.findall(new_content)
+        matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+        with self._undo_block():
+            # Apply from the bottom up so earlier line numbers stay valid.
+            for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+                if tag != "equal":
+                    self.text.replace(f"{i1 + 1}.0", f"{i2 + 1}.0", "".join(new_lines[j1:j2]))
 
     def goto_definition(self):
         """Jump to the definition of the word under the cursor."""
@@ -253,18 +629,20 @@ class CodeEditor:
             messagebox.showinfo("Go to Definition", "No symbol selected")
             return
 
-        pattern = re.compile(rf"^\s*(def|class)\s+{re.escape(word)}\b")
-        lines = self.text.get("1.0", tk.END).splitlines()
-        for i, line in enumerate(lines, start=1):
-            if pattern.search(line):
-                self.text.tag_remove("definition", "1.0", tk.END)
-                start = f"{i}.0"
-                end = f"{i}.0 lineend"
-                self.text.tag_add("definition", start, end)
-                self.text.tag_config("definition", background="lightblue")
-                self.text.mark_set(tk.INSERT, start)
-                self.text.see(start)
-                return
+        # Tk's regexp engine scans the widget directly (\y is a Tcl word
+        # boundary), so the buffer is never copied into Python.
+        index = self.text.search(
+            rf"^[ \t]*(def|class)\s+{re.escape(word)}\y", "1.0", stopindex=tk.END, regexp=True
+        )
+        if index:
+            line = index.split(".")[0]
+            self.text.tag_remove("definition", "1.0", tk.END)
+            start = f"{line}.0"
+            end = f"{line}.0 lineend"
+            self.text.tag_add("definition", start, end)
+            self.text.mark_set(tk.INSERT, start)
+            self.text.see(start)
+            return
         messagebox.showinfo("Go to Definition", f"Definition for '{word}' not found")
 
     def _get_current_word(self) -> str:
@@ -284,12 +662,25 @@ class CodeEditor:
         prompt = simpledialog.askstring("Ask CodeSmith", "Enter your prompt:")
         if not prompt:
             return
-        try:
-            answer = query_ai(prompt, "coding", self.settings.get("model"))
-        except RuntimeError as exc:
-            messagebox.showerror(AGENT_NAME, str(exc))
-            return
-        messagebox.showinfo(AGENT_NAME, answer)
+        window = tk.Toplevel(self.root)
+        window.title(AGENT_NAME)
+        output = ScrolledText(window, wrap="word")
+        output.pack(fill="both", expand=True)
+        model = self.settings.get("model")
+
+        def worker():
+            try:
+                for chunk in stream_ai(prompt, "coding", model):
+                    self.root.after(0, self._append_output, output, chunk)
+            except Exception as exc:
+                self.root.after(0, self._show_error, exc)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _append_output(self, widget, chunk):
+        if widget.winfo_exists():
+            widget.insert(tk.END, chunk)
+            widget.see(tk.END)
 
     def codesmith_edit(self):
         instructions = simpledialog.askstring(
@@ -297,25 +688,36 @@ class CodeEditor:
         )
         if not instructions:
             return
-        try:
+        content = self._doc()
+        model = self.settings.get("model")
+
+        def request():
             api_key = load_api_key()
             router = get_router(api_key)
-        except RuntimeError as exc:
-            messagebox.showerror(AGENT_NAME, str(exc))
-            return
-        content = self.text.get("1.0", tk.END)
-        model = self.settings.get("model") or list_openai_models(api_key)[0]
-        messages = _build_edit_messages(content, instructions, model)
-        try:
-            route = router.check_for_matching_routes(model)
+            model_name = model or list_openai_models(api_key)[0]
+            messages = _build_edit_messages(content, instructions, model_name)
+            route = router.check_for_matching_routes(model_name)
             llm = route.llm if route and route.llm else router.llm
             if llm is None:
                 raise RuntimeError("No LLM configured for Semantic Router.")
-            new_content = llm(messages)
-            self.text.delete("1.0", tk.END)
-            self.text.insert("1.0", new_content)
-        except Exception as exc:
-            messagebox.showerror(AGENT_NAME, str(exc))
+            return llm(messages)
+
+        progress = self._show_progress("Editing with CodeSmith...")
+
+        def done(new_content):
+            progress.destroy()
+            if self._doc() != content and not messagebox.askyesno(
+                AGENT_NAME,
+                "The file changed while CodeSmith was working. Apply its edit anyway?",
+            ):
+                return
+            self._apply_content(new_content)
+
+        def failed(exc):
+            progress.destroy()
+            self._show_error(exc)
+
+        self._run_async(request, done, failed)
 
     def codesmith_run_command(self):
         if not self.allow_codesmith_terminal.get():
@@ -329,42 +731,60 @@ class CodeEditor:
         )
         if not task:
             return
-        try:
-            answer = query_ai(
-                f"Return only the shell command to accomplish: {task}",
-                "coding",
-                self.settings.get("model"),
-            )
-        except RuntimeError as exc:
-            messagebox.showerror(AGENT_NAME, str(exc))
-            return
-        cmd = answer.strip()
-        if cmd.startswith("```"):
-            cmd = cmd.strip("` \n")
-            lines = cmd.splitlines()
-            if lines and (lines[0].startswith("bash") or lines[0].startswith("sh")):
-                lines = lines[1:]
-            cmd = "\n".join(lines).strip()
+        model = self.settings.get("model")
+        self._run_async(lambda: suggest_command(task, model), self._confirm_and_run_command)
+
+    def _confirm_and_run_command(self, cmd):
         if not messagebox.askyesno(AGENT_NAME, f"Run this command?\n\n{cmd}"):
             return
-        try:
-            completed = subprocess.run(
-                cmd, shell=True, capture_output=True, text=True
-            )
-            output = completed.stdout + completed.stderr
-        except Exception as exc:
-            output = str(exc)
-        messagebox.showinfo("Command Output", output or "(no output)")
+        self.open_terminal()
+        self._start_terminal_command(cmd)
+
+    def _run_async(self, fn, on_ok, on_err=None, executor=None):
+        """Run ``fn`` on a worker thread and deliver the outcome on the Tk thread.
 
-    def _fetch_code_suggestions(self, prefix: str):
-        """Query the CodeSmith agent for code completion suggestions."""
+        ``on_ok`` receives the return value; ``on_err`` (by default an error
+        dialog) receives any exception raised.  Passing an ``executor`` runs
+        ``fn`` there instead of on a fresh thread.
+        """
+        def worker():
+            try:
+                result = fn()
+            except Exception as exc:
+                self.root.after(0, on_err or self._show_error, exc)
+                return
+            self.root.after(0, on_ok, result)
+
+        if executor is not None:
+            executor.submit(worker)
+        else:
+            threading.Thread(target=worker, daemon=True).start()
+
+    def _show_error(self, exc):
+        messagebox.showerror(AGENT_NAME, str(exc))
+
+    def _show_progress(self, message):
+        dialog = tk.Toplevel(self.root)
+        dialog.title(AGENT_NAME)
+        dialog.transient(self.root)
+        tk.Label(dialog, text=message).pack(padx=10, pady=(10, 5))
+        bar = ttk.Progressbar(dialog, mode="indeterminate", length=200)
+        bar.pack(padx=10, pady=(0, 10))
+        bar.start()
+        return dialog
+
+    def _fetch_code_suggestions(self, prefix: str, context: str):
+        """Query the CodeSmith agent for code completion suggestions.
+
+        Runs on a worker thread, so ``context`` must be read from the text
+        widget by the caller.
+        """
         try:
             api_key = load_api_key()
             router = get_router(api_key)
             model = self.settings.get("model") or list_openai_models(api_key)[0]
         except RuntimeError:
             return []
-        context = self.text.get("1.0", tk.INSERT)[-400:]
         messages = [
             Message(
                 role="system",
@@ -391,15 +811,52 @@ class CodeEditor:
             return []
 
     def show_autocomplete(self):
+        # Debounce rapid requests so only the last one reaches CodeSmith.
+        if self._autocomplete_after_id is not None:
+            self.root.after_cancel(self._autocomplete_after_id)
+        self._autocomplete_after_id = self.root.after(
+            AUTOCOMPLETE_DEBOUNCE_MS, self._request_autocomplete
+        )
+
+    def _request_autocomplete(self):
+        self._autocomplete_after_id = None
         prefix = self._get_current_prefix()
         if not prefix.strip():
             return
-        suggestions = [s for s in self._fetch_code_suggestions(prefix) if s.startswith(prefix)]
+        index = self.text.index(tk.INSERT)
+        context = self.text.get(f"{tk.INSERT}-400c", tk.INSERT)
+        key = (prefix, context)
+        cached = self._suggestion_cache.get(key)
+        if cached and time.monotonic() - cached[0] < SUGGESTION_CACHE_TTL:
+            self._show_suggestions(prefix, index, cached[1])
+            return
+
+        def worker():
+            suggestions = [
+                s for s in self._fetch_code_suggestions(prefix, context) if s.startswith(prefix)
+            ]
+            self.root.after(0, lambda: self._cache_suggestions(key, index, suggestions))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _cache_suggestions(self, key, index, suggestions):
+        if suggestions:
+            now = time.monotonic()
+            if len(self._suggestion_cache) >= SUGGESTION_CACHE_SIZE:
+                self._suggestion_cache = {
+                    k: v for k, v in self._suggestion_cache.items()
+                    if now - v[0] < SUGGESTION_CACHE_TTL
+                }
+                if len(self._suggestion_cache) >= SUGGESTION_CACHE_SIZE:
+                    self._suggestion_cache.pop(next(iter(self._suggestion_cache)))
+            self._suggestion_cache[key] = (now, suggestions)
+        self._show_suggestions(key[0], index, suggestions)
+
+    def _show_suggestions(self, prefix, index, suggestions):
+        if self.text.index(tk.INSERT) != index:
+            return  # the cursor moved while suggestions were being fetched
         if not suggestions:
-            local_suggestions = set(keyword.kwlist)
-            document_words = re.findall(r"\b\w+\b", self.text.get("1.0", tk.END))
-            local_suggestions.update(document_words)
-            suggestions = sorted({s for s in local_suggestions if s.startswith(prefix) and s != prefix})
+            suggestions = self._local_suggestions(prefix)
         if not suggestions:
             return
         if len(suggestions) == 1:
@@ -407,6 +864,127 @@ class CodeEditor:
             return
         self._open_autocomplete_window(suggestions, prefix)
 
+    def _install_text_proxy(self):
+        """Route the text widget's Tcl command through :meth:`_text_proxy`."""
+        widget = self.text._w
+        self._text_orig = f"{widget}_orig"
+        self.text.tk.call("rename", widget, self._text_orig)
+        self.text.tk.createcommand(widget, self._text_proxy)
+
+    def _text_proxy(self, cmd, *args):
+        """Forward a widget command, updating the word index for edits.
+
+        Only the lines touched by an insert, delete or replace are
+        retokenized, so the index stays current without rescanning the
+        buffer.  Edits confined to the same lines are coalesced and applied
+        once typing pauses, so half-typed words never reach the index.
+        """
+        call = self.text.tk.call
+        orig = self._text_orig
+        if cmd == "edit" and args and args[0] in ("undo", "redo"):
+            self._word_index_stale = True
+        if cmd not in ("insert", "delete", "replace") or not args or self._word_index_stale:
+            return call((orig, cmd) + args)
+        try:
+            if cmd == "insert":
+                indices = [args[0]]
+            elif cmd == "delete":
+                indices = list(args) if len(args) > 1 else [args[0], f"{args[0]}+1c"]
+            else:
+                indices = list(args[:2])
+            total = int(str(call(orig, "index", "end")).split(".")[0])
+            # Tk treats "end" as the end of the last real line (end-1c), so
+            # clamp there to retokenize the line the edit actually touches.
+            lines = [
+                min(int(str(call(orig, "index", i)).split(".")[0]), total - 1)
+                for i in indices
+            ]
+        except tk.TclError:
+            return call((orig, cmd) + args)  # let Tk report the bad index
+        start, end = min(lines), max(lines)
+        pending = self._word_pending
+        if pending and not (pending[0] <= start and end <= pending[1]):
+            self._flush_word_index()
+            pending = None
+        if pending is None:
+            old = call(orig, "get", f"{start}.0", f"{end}.0 lineend")
+            pending = self._word_pending = [start, end, old]
+        result = call((orig, cmd) + args)
+        pending[1] += int(str(call(orig, "index", "end")).split(".")[0]) - total
+        if self._word_index_after_id is not None:
+            self.root.after_cancel(self._word_index_after_id)
+        self._word_index_after_id = self.root.after(
+            WORD_INDEX_DEBOUNCE_MS, self._flush_word_index
+        )
+        return result
+
+    def _flush_word_index(self):
+        """Apply the coalesced edit recorded by :meth:`_text_proxy`."""
+        if self._word_index_after_id is not None:
+            self.root.after_cancel(self._word_index_after_id)
+            self._word_index_after_id = None
+        pending, self._word_pending = self._word_pending, None
+        if pending is None or self._word_index_stale:
+            return
+        start, end, old = pending
+        new = self.text.tk.call(self._text_orig, "get", f"{start}.0", f"{end}.0 lineend")
+        self._update_word_index(old, new)
+
+    def _update_word_index(self, old, new):
+        delta = Counter(_WORD_RE.findall(new))
+        delta.subtract(_WORD_RE.findall(old))
+        counts = self._word_counts
+        for word, change in delta.items():
+            if not change:
+                continue
+            before = counts[word]
+            after = before + change
+            if after > 0:
+                counts[word] = after
+                if before <= 0 and word not in _KEYWORDS:
+                    self._word_trie.insert(word)
+            else:
+                del counts[word]
+                if word not in _KEYWORDS:
+                    self._word_trie.remove(word)
+
+    def _on_text_modified(self, event=None):
+        self._doc_cache = None
+        self._find_stale = True
+        # Reset the flag so Tk raises <<Modified>> again on the next edit.
+        self.text.edit_modified(False)
+
+    def _check_modified(self):
+        """Apply an edit whose <<Modified>> event has not been delivered yet."""
+        if self.text.edit_modified():
+            self._on_text_modified()
+
+    def _doc(self):
+        """Return the buffer contents, cached until the next edit."""
+        self._check_modified()
+        if self._doc_cache is None:
+            self._doc_cache = self.text.get("1.0", tk.END)
+        return self._doc_cache
+
+    def _local_suggestions(self, prefix):
+        """Return the first keywords and document words extending ``prefix``.
+
+        Candidates come from the incrementally maintained trie, and only the
+        alphabetically first ``AUTOCOMPLETE_MAX_SUGGESTIONS`` are kept, so a
+        short prefix never sorts the whole vocabulary. The index is rebuilt
+        from the buffer only after undo or redo, which bypass per-line
+        tracking.
+        """
+        self._flush_word_index()
+        if self._word_index_stale:
+            self._word_counts = Counter(_WORD_RE.findall(self._doc()))
+            self._word_trie = PrefixTrie(_KEYWORDS.union(self._word_counts))
+            self._word_index_stale = False
+        return heapq.nsmallest(
+            AUTOCOMPLETE_MAX_SUGGESTIONS,
+            (w for w in self._word_trie.iter_prefix(prefix) if w != prefix),
+        )
+
     def _open_autocomplete_window(self, matches, prefix):
         if hasattr(self, "autocomplete_window") and self.autocomplete_window.winfo_exists():
             self.autocomplete_window.destroy()
@@ -420,9 +998,16 @@ class CodeEditor:
         self.autocomplete_window.wm_overrideredirect(True)
         self.autocomplete_window.geometry(f"+{x}+{y}")
         listbox = tk.Listbox(self.autocomplete_window, height=min(6, len(matches)))
-        for m in matches:
-            listbox.insert(tk.END, m)
+        listbox.insert(tk.END, *matches[:AUTOCOMPLETE_PAGE_SIZE])
         listbox.pack()
+
+        def show_more(event):
+            # Add the next page once the user arrows onto the last entry.
+            shown = listbox.size()
+            if shown < len(matches) and listbox.index(tk.ACTIVE) >= shown - 1:
+                listbox.insert(tk.END, *matches[shown:shown + AUTOCOMPLETE_PAGE_SIZE])
+
+        listbox.bind("<Down>", show_more)
         listbox.bind("<Return>", lambda event: self._insert_autocomplete(prefix))
         listbox.bind("<Double-Button-1>", lambda event: self._insert_autocomplete(prefix))
         listbox.bind("<Escape>", lambda event: self.autocomplete_window.destroy())
@@ -455,6 +1040,8 @@ class CodeEditor:
         self.terminal_entry.pack(side="left", fill="x", expand=True)
         self.terminal_entry.bind("<Return>", lambda event: self.run_command())
 
+        stop_button = tk.Button(entry_frame, text="Stop", command=self.stop_commands)
+        stop_button.pack(side="right")
         run_button = tk.Button(entry_frame, text="Run", command=self.run_command)
         run_button.pack(side="right")
 
@@ -462,22 +1049,53 @@ class CodeEditor:
         command = self.terminal_entry.get()
         if not command.strip():
             return
-        self.terminal_output.insert(tk.END, f"$ {command}\n")
         self.terminal_entry.delete(0, tk.END)
+        self._start_terminal_command(command)
+
+    def _start_terminal_command(self, command):
+        """Run ``command`` in a shell, streaming its output to the terminal."""
+        output = self.terminal_output
+        output.insert(tk.END, f"$ {command}\n")
 
         def worker():
+            import subprocess
+
             try:
-                completed = subprocess.run(
-                    command, shell=True, capture_output=True, text=True
+                proc = subprocess.Popen(
+                    command,
+                    shell=True,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    text=True,
+                    errors="replace",
+                    bufsize=1,
+                    # Own process group, so Stop reaches pipelines and
+                    # background children, not just the shell.
+                    start_new_session=os.name == "posix",
                 )
-                output = completed.stdout + completed.stderr
             except Exception as e:
-                output = str(e) + "\n"
-            self.terminal_output.insert(tk.END, output)
-            self.terminal_output.see(tk.END)
+                self.root.after(0, self._append_output, output, str(e) + "\n")
+                return
+            self._terminal_processes.add(proc)
+            try:
+                for line in proc.stdout:
+                    self.root.after(0, self._append_output, output, line)
+                proc.wait()
+            finally:
+                self._terminal_processes.discard(proc)
 
         threading.Thread(target=worker, daemon=True).start()
 
+    def stop_commands(self):
+        for proc in list(self._terminal_processes):
+            if os.name == "posix":
+                import signal
+
+                with contextlib.suppress(ProcessLookupError):
+                    os.killpg(proc.pid, signal.SIGTERM)
+            else:
+                proc.terminate()
+
 
 def main():
     if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
@@ -1,11 +1,14 @@
 import re
 from tkinter import messagebox
 
+_WORD_RE = re.compile(r"\b\w+\b")
+
 
 def register(editor):
     def count_words():
         content = editor.text.get("1.0", "end")
-        words = re.findall(r"\b\w+\b", content)
-        messagebox.showinfo("Word Count", f"{len(words)} words")
+        # subn counts matches in C without building a list of every word.
+        count = _WORD_RE.subn("", content)[1]
+        messagebox.showinfo("Word Count", f"{count} words")
 
     editor.add_extension_command("Word Count", count_words)
@@ -1,6 +1,14 @@
 from __future__ import annotations
+import contextlib
 import os
-from flask import Flask, request, render_template_string, jsonify
+import shutil
+import tempfile
+from flask import Flask, request, jsonify, send_file
+
+try:  # optional production WSGI server
+    from waitress import serve
+except Exception:  # pragma: no cover - fall back to the Flask server
+    serve = None  # type: ignore
 
 app = Flask(__name__)
 
@@ -14,7 +22,7 @@ EDITOR_HTML = """
 <script src="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.5/mode/python/python.min.js"></script>
 </head>
 <body>
-<textarea id="editor">{{ content }}</textarea>
+<textarea id="editor"></textarea>
 <div style="margin-top:10px;">
   <input id="path" type="text" value="{{ path }}" placeholder="File path" style="width:70%;"/>
   <button onclick="save()">Save</button>
@@ -27,11 +35,17 @@ var editor = CodeMirror.fromTextArea(document.getElementById('editor'), {
   mode: 'python'
 });
 editor.setSize('100%', '80vh');
+var initialPath = document.getElementById('path').value;
+if (initialPath) {
+  fetch('/raw?path=' + encodeURIComponent(initialPath))
+    .then(resp => resp.ok ? resp.text() : '')
+    .then(text => editor.setValue(text));
+}
 function save() {
-  fetch('/save', {
+  fetch('/save?path=' + encodeURIComponent(document.getElementById('path').value), {
     method: 'POST',
-    headers: {'Content-Type': 'application/json'},
-    body: JSON.stringify({path: document.getElementById('path').value, content: editor.getValue()})
+    headers: {'Content-Type': 'text/plain; charset=utf-8'},
+    body: editor.getValue()
   }).then(resp => resp.json()).then(data => {
     document.getElementById('status').textContent = data.message || data.status;
     setTimeout(() => { document.getElementById('status').textContent = ''; }, 2000);
@@ -48,32 +62,94 @@ document.addEventListener('keydown', function(e) {
 </html>
 """
 
+# Parsed once; render_template_string would re-parse EDITOR_HTML per request.
+_EDITOR_TEMPLATE = app.jinja_env.from_string(EDITOR_HTML)
+_EMPTY_PAGE = _EDITOR_TEMPLATE.render(path='')
+
+# Request bodies are copied to disk in chunks of this size.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Read once at import, while single-threaded: os.umask can only be read by
+# setting it.  New files get the permissions open() would give them.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Files outside this directory cannot be read or written.
+ALLOWED_ROOT = os.path.realpath(os.environ.get('EDITOR_ROOT', os.getcwd()))
+
+def _resolve(path):
+    """Return the real path of ``path`` if it lies under ``ALLOWED_ROOT``.
+
+    Resolved on every request: a cached answer would stay approved after
+    the path is swapped for a symlink pointing outside the root.
+    """
+    try:
+        real = os.path.realpath(path)
+        inside = os.path.commonpath([real, ALLOWED_ROOT]) == ALLOWED_ROOT
+    except ValueError:  # embedded NUL, or another drive on Windows
+        return None
+    return real if inside else None
+
+def _write_upload(real):
+    """Stream the request body into ``real``, replacing it only once complete.
+
+    The body goes to a temporary file in the same directory, so a client
+    that disconnects mid-upload leaves the original file untouched.
+    """
+    try:
+        mode = os.stat(real).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    fd, tmp = tempfile.mkstemp(
+        dir=os.path.dirname(real), prefix=f".{os.path.basename(real)}.", suffix=".tmp"
+    )
+    try:
+        with open(fd, 'wb') as f:
+            os.chmod(tmp, mode)
+            shutil.copyfileobj(request.stream, f, STREAM_CHUNK_SIZE)
+            length = request.content_length
+            if length is not None and f.tell() != length:
+                raise OSError('Upload was incomplete')
+        os.replace(tmp, real)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp)
+        raise
+
 @app.route('/')
 def index():
     path = request.args.get('path', '')
-    content = ''
-    if path:
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except Exception:
-            content = ''
-    return render_template_string(EDITOR_HTML, content=content, path=path)
+    if not path:
+        return _EMPTY_PAGE
+    # The page only carries the path; the browser fetches the contents from
+    # /raw, so they are never escaped into the HTML.
+    return _EDITOR_TEMPLATE.render(path=path)
+
+@app.route('/raw')
+def raw_file():
+    path = request.args.get('path', '')
+    real = _resolve(path) if path else None
+    if real is None or not os.path.isfile(real):
+        return jsonify({'status': 'error', 'message': 'File not found'}), 404
+    return send_file(real, mimetype='text/plain')
 
 @app.route('/save', methods=['POST'])
 def save_file():
-    data = request.get_json(force=True)
-    path = data.get('path')
-    content = data.get('content', '')
+    path = request.args.get('path')
     if not path:
         return jsonify({'status': 'error', 'message': 'No path provided'}), 400
+    real = _resolve(path)
+    if real is None:
+        return jsonify({'status': 'error', 'message': 'Path is outside the editor root'}), 403
     try:
-        with open(path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        _write_upload(real)
         return jsonify({'status': 'ok', 'message': 'File saved'})
     except Exception as exc:
         return jsonify({'status': 'error', 'message': str(exc)}), 500
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
-    app.run(debug=True, port=port)
+    if serve is not None:
+        serve(app, host='127.0.0.1', port=port, threads=8)
+    else:
+        app.run(debug=True, port=port, threaded=True)